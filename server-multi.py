@@ -2,20 +2,36 @@ import asyncio
 import argparse
 import json
 import logging
+import os
 import time
 import subprocess
 import socket
 import platform
 import getpass
 import sys
+import threading
+import re
 from pathlib import Path
+from collections import Counter
 from dataclasses import dataclass
-from typing import Optional, Set, Dict
+from typing import Callable, Optional, Set, Dict, FrozenSet, Tuple
 
 import websockets
 import serial
 import serial.tools.list_ports
 
+# Optional accelerator: orjson (pip install orjson). Falls back to stdlib json.
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
+# Optional accelerator: uvloop (pip install uvloop, POSIX only). Falls back to asyncio's loop.
+try:
+    import uvloop  # type: ignore
+except ImportError:
+    uvloop = None
+
 # SSOT topology (controllerId -> channel -> encoder deviceId)
 # Ensure the folder containing this script is importable so we can load
 # `time_pitch_mapping.py` when running from systemd / different CWD.
@@ -50,6 +66,8 @@ except Exception as e:
 # WebSocket output
 # ----------------
 #   - Forwards "set" payloads (channel is preserved)
+#     only to clients serving that engine (per their hello "engineSlots");
+#     clients that never sent engineSlots receive all engines
 #   - Broadcasts controllerStatus periodically and on-change
 #
 # controllerStatus includes
@@ -82,19 +100,37 @@ WS_PORT = 8765
 SERIAL_BAUD = 115200
 SERIAL_SCAN_INTERVAL_SEC = 2.0
 SERIAL_PROBE_TIMEOUT_SEC = 1.0
+# Longest probe reply line we wait for; a device streaming without newlines
+# can't make the probe buffer grow without bound.
+SERIAL_PROBE_MAX_LINE = 4096
+# Max serial read batches buffered between the reader thread and the asyncio side.
+# When full, the reader thread waits (backpressure) instead of growing memory.
+SERIAL_RX_QUEUE_MAX = 1024
 
 # Match rules
 TARGET_DEVICE_TYPE = "bauklank-controller"
 
 # ✅ Serial port exclude list (exact device paths)
-SERIAL_PORT_EXCLUDE: Set[str] = {
+SERIAL_PORT_EXCLUDE: FrozenSet[str] = frozenset({
     "/dev/cu.debug-console",
     "/dev/cu.Bluetooth-Incoming-Port",
-}
+})
 
 # Engines carried over WebSocket
 ENGINE_SLOTS = ["A", "B"]
 
+# WebSocket fan-out
+# Every client gets its own bounded send queue, drained by a per-client writer
+# task, so one slow client never delays the others. A client that falls this
+# many messages behind loses its oldest queued message (newer state wins).
+WS_CLIENT_SEND_QUEUE_MAX = 64
+
+# Encoder "set" coalescing
+# A fast knob turn can emit hundreds of set lines per second. Within this window
+# only the latest value per (engine, key) is broadcast; the first update after a
+# quiet period still goes out immediately. 0 disables coalescing.
+SET_COALESCE_INTERVAL_SEC = 1.0 / 30.0
+
 # =========================
 # CLI
 # =========================
@@ -142,7 +178,10 @@ def _parse_args():
         type=str,
         choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
         default="WARNING",
-        help="Log level after startup completes. Default: WARNING (quiet for journal).",
+        help=(
+            "Log level after startup completes. Default: WARNING (quiet for journal). "
+            "DEBUG is for diagnostics only: it logs every serial line and WS message."
+        ),
     )
 
     return parser.parse_args()
@@ -178,6 +217,9 @@ HEARTBEAT_INTERVAL_SEC = 60.0
 # This intentionally does NOT require controller firmware changes.
 ENCODER_OFFLINE_TIMEOUT_SEC = 10.0
 ENCODER_STATUS_POLL_SEC = 1.0
+# controllerStatus is re-broadcast at least this often (so ageMs visibly progresses).
+# Between refreshes the status task sleeps until the next encoder timeout is due.
+ENCODER_STATUS_REFRESH_SEC = 5.0
 ENCODER_STATUS_INTERVAL_SEC = 1.0
 
 # =========================
@@ -209,6 +251,34 @@ def _set_run_log_level(level_name: str) -> None:
         logging.getLogger("websockets").setLevel(logging.WARNING)
 
 
+# =========================
+# JSON (orjson when available)
+# =========================
+# The serial -> websocket path encodes/decodes every "set" message, so use orjson
+# there when installed. Encoded payloads stay `str` so websockets keeps sending
+# text frames (the web app does JSON.parse(evt.data)).
+if orjson is not None:
+    JSON_BACKEND = "orjson"
+
+    def _json_dumps(message) -> str:
+        return orjson.dumps(message).decode("utf-8")
+
+    def _json_dumps_line(message) -> bytes:
+        return orjson.dumps(message) + b"\n"
+
+    _json_loads = orjson.loads
+else:
+    JSON_BACKEND = "json"
+
+    def _json_dumps(message) -> str:
+        return json.dumps(message)
+
+    def _json_dumps_line(message) -> bytes:
+        return (json.dumps(message) + "\n").encode("utf-8")
+
+    _json_loads = json.loads
+
+
 # =========================
 # Version
 # =========================
@@ -229,15 +299,14 @@ def _run_git(args: list[str], repo_dir: Path, timeout_s: float = 0.4) -> Optiona
         return None
 
 
-def _git_short_hash(repo_dir: Path) -> Optional[str]:
-    return _run_git(["rev-parse", "--short", "HEAD"], repo_dir)
-
-
-def _git_is_dirty(repo_dir: Path) -> Optional[bool]:
-    out = _run_git(["status", "--porcelain"], repo_dir)
-    if out is None:
-        return None
-    return len(out) > 0
+def _git_describe(repo_dir: Path, *, dirty: bool) -> Optional[str]:
+    # One git call for both hash and dirty flag. `--exclude=*` ignores tags so
+    # --always yields the bare short hash; --dirty only inspects tracked files
+    # (no full-tree `git status` scan). Output: "<hash>" or "<hash>-dirty".
+    args = ["describe", "--always", "--abbrev=7", "--exclude=*"]
+    if dirty:
+        args.append("--dirty")
+    return _run_git(args, repo_dir)
 
 
 def _load_version_json(version_file: Path) -> Optional[str]:
@@ -274,23 +343,35 @@ def build_server_version() -> str:
     if not APPEND_GIT_HASH_TO_VERSION:
         return base
 
-    short_hash = _git_short_hash(repo_dir)
-    if not short_hash:
+    described = _git_describe(repo_dir, dirty=APPEND_GIT_DIRTY_SUFFIX)
+    if not described:
         return base
 
-    dirty_suffix = ""
-    if APPEND_GIT_DIRTY_SUFFIX:
-        dirty = _git_is_dirty(repo_dir)
-        if dirty is True:
-            dirty_suffix = "-dirty"
-
-    return f"{base}+g{short_hash}{dirty_suffix}"
+    return f"{base}+g{described}"
 
 
 # =========================
 # Machine info (for status bar)
 # =========================
+# The primary IP (kernel route lookup through a UDP socket) is cached briefly:
+# machine_status_task polls every 5s, but the default route rarely changes.
+PRIMARY_IP_CACHE_TTL_SEC = 30.0
+_PRIMARY_IP_CACHE: Optional[Tuple[str, float]] = None
+
+
 def _get_primary_ipv4() -> str:
+    global _PRIMARY_IP_CACHE
+    now = time.monotonic()
+    if _PRIMARY_IP_CACHE is not None and (now - _PRIMARY_IP_CACHE[1]) < PRIMARY_IP_CACHE_TTL_SEC:
+        return _PRIMARY_IP_CACHE[0]
+
+    ip = _lookup_primary_ipv4()
+    # Only cache a real answer, so a missing route at boot is retried next poll.
+    _PRIMARY_IP_CACHE = (ip, now) if ip else None
+    return ip
+
+
+def _lookup_primary_ipv4() -> str:
     try:
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         try:
@@ -302,10 +383,9 @@ def _get_primary_ipv4() -> str:
         return ""
 
 
-def _get_all_ipv4() -> list[str]:
+def _get_all_ipv4(hostname: str) -> list[str]:
     ips: list[str] = []
     try:
-        hostname = socket.gethostname()
         _name, _aliases, addrs = socket.gethostbyname_ex(hostname)
         for ip in addrs:
             if ip and ip not in ips:
@@ -318,10 +398,13 @@ def _get_all_ipv4() -> list[str]:
         ips.insert(0, primary)
 
     non_loopback = [ip for ip in ips if not ip.startswith("127.")]
-    return non_loopback if non_loopback else ips
+    ips = non_loopback if non_loopback else ips
+    # Keep the primary first, sort the rest so resolver ordering can't look like a change.
+    return ips[:1] + sorted(ips[1:])
 
 
-def build_machine_status() -> dict:
+def _build_static_machine_fields() -> dict:
+    # Fixed for the lifetime of the process: computed once, not every status tick.
     try:
         hostname = socket.gethostname()
     except Exception:
@@ -342,29 +425,61 @@ def build_machine_status() -> dict:
     except Exception:
         user = ""
 
-    ips = _get_all_ipv4()
-    primary_ip = ips[0] if ips else ""
-
     return {
-        "type": "machineStatus",
         "hostname": hostname,
         "user": user,
         "platform": platform_label,
         "arch": machine,
+        "python": platform.python_version(),
+    }
+
+
+_STATIC_MACHINE_FIELDS: dict = _build_static_machine_fields()
+
+
+def build_machine_status(ips: Optional[list[str]] = None) -> dict:
+    static = _STATIC_MACHINE_FIELDS
+    if ips is None:
+        ips = _get_all_ipv4(static["hostname"])
+    primary_ip = ips[0] if ips else ""
+
+    return {
+        "type": "machineStatus",
+        "hostname": static["hostname"],
+        "user": static["user"],
+        "platform": static["platform"],
+        "arch": static["arch"],
         "ip": primary_ip,
         "ips": ips,
-        "python": platform.python_version(),
+        "python": static["python"],
     }
 
 
+# Placeholders until main() calls _load_boot_status(), which runs the git call
+# and the hostname/IP lookup side by side instead of serially at import time.
 SERVER_VERSION_MSG: dict = {
     "type": "serverVersion",
-    "version": build_server_version(),
+    "version": "0.0.0",
 }
 
-MACHINE_STATUS: dict = build_machine_status()
+MACHINE_STATUS: dict = build_machine_status([])
+
+# Encoded once and re-sent as-is to every newly connected WS client.
+SERVER_VERSION_PAYLOAD: str = _json_dumps(SERVER_VERSION_MSG)
+MACHINE_STATUS_PAYLOAD: str = _json_dumps(MACHINE_STATUS)
 
 
+async def _load_boot_status() -> None:
+    global SERVER_VERSION_MSG, MACHINE_STATUS, SERVER_VERSION_PAYLOAD, MACHINE_STATUS_PAYLOAD
+    version, machine_status = await asyncio.gather(
+        asyncio.to_thread(build_server_version),
+        asyncio.to_thread(build_machine_status),
+    )
+    SERVER_VERSION_MSG = {"type": "serverVersion", "version": version}
+    MACHINE_STATUS = machine_status
+    SERVER_VERSION_PAYLOAD = _json_dumps(SERVER_VERSION_MSG)
+    MACHINE_STATUS_PAYLOAD = _json_dumps(MACHINE_STATUS)
+
 
 
 # =========================
@@ -383,6 +498,8 @@ def _log_startup_debug() -> None:
         log.info("🎛️ Expected controller deviceId(s): ANY (STRICT allowlist=OFF)")
 
     log.info(f"🎛️ Expected controller deviceType: {TARGET_DEVICE_TYPE}")
+    log.info(f"🧾 JSON backend: {JSON_BACKEND}")
+    log.info(f"🔁 Event loop: {type(asyncio.get_running_loop()).__module__}")
     log.info("🎛️ Expected serial hello payload fields: type='hello', deviceType, deviceId, fw")
     log.info("🎛️ Expected serial set payload: {type:'set', channel:'A|B', key:'...', value:...}")
 
@@ -438,119 +555,217 @@ def _log_startup_debug() -> None:
 # =========================
 # WebSocket client registry
 # =========================
-CLIENTS: Set[websockets.WebSocketServerProtocol] = set()
+# Copy-on-write list: connect/disconnect rebind CLIENTS to a new list instead of
+# mutating it, so broadcasts iterate a stable list without taking a snapshot copy.
+CLIENTS: list[websockets.WebSocketServerProtocol] = []
+# Engine slots each client serves, from its {"type":"hello","engineSlots":[...]}
+# (or {"type":"subscribe","engine":"A"}). "set" messages for other engines are
+# not sent to that client. Clients without an entry receive every engine.
+CLIENT_ENGINES: Dict[object, frozenset] = {}
+# Outgoing payloads per client; drained by that client's _client_writer task.
+CLIENT_QUEUES: Dict[object, asyncio.Queue] = {}
+
+
+def _enqueue_payload(clients: list, payload: str) -> None:
+    for ws in clients:
+        queue = CLIENT_QUEUES.get(ws)
+        if queue is None:
+            continue
+        if queue.full():
+            # Lagging client: drop its oldest message rather than grow memory.
+            queue.get_nowait()
+        queue.put_nowait(payload)
 
 
-async def broadcast(message: dict):
-    if not CLIENTS:
-        return
-    payload = json.dumps(message)
-    dead = []
-    for ws in CLIENTS:
-        try:
+async def _client_writer(ws, queue: asyncio.Queue) -> None:
+    try:
+        while True:
+            payload = await queue.get()
             await ws.send(payload)
-        except websockets.exceptions.ConnectionClosed:
-            dead.append(ws)
-    for ws in dead:
-        CLIENTS.discard(ws)
+    except websockets.exceptions.ConnectionClosed:
+        # ws_handler's receive loop ends too and unregisters the client.
+        pass
+
+
+def _clients_for_engine(engine: Optional[str]) -> list:
+    # engine=None (status messages) -> everyone. Clients that never told us
+    # their engines get everything too (old web app builds).
+    if engine is None or not CLIENT_ENGINES:
+        return CLIENTS
+    out = []
+    for ws in CLIENTS:
+        engines = CLIENT_ENGINES.get(ws)
+        if engines is None or engine in engines:
+            out.append(ws)
+    return out
+
+
+def broadcast_payload(payload: str, engine: Optional[str] = None) -> None:
+    """Queue an already-encoded JSON payload for all WS clients (optionally only those serving `engine`)."""
+    clients = _clients_for_engine(engine)
+    if not clients:
+        return
+    _enqueue_payload(clients, payload)
+
+
+def _add_client(ws, queue: asyncio.Queue) -> None:
+    global CLIENTS
+    CLIENT_QUEUES[ws] = queue
+    CLIENTS = [*CLIENTS, ws]
+
+
+def _remove_clients(gone) -> None:
+    global CLIENTS
+    CLIENTS = [ws for ws in CLIENTS if ws not in gone]
+    for ws in gone:
+        CLIENT_ENGINES.pop(ws, None)
+        CLIENT_QUEUES.pop(ws, None)
+
+
+def broadcast(message: dict, engine: Optional[str] = None) -> None:
+    # Resolve recipients first so a message nobody subscribed to isn't even encoded.
+    clients = _clients_for_engine(engine)
+    if not clients:
+        return
+    _enqueue_payload(clients, _json_dumps(message))
 
 
 async def machine_status_task():
-    global MACHINE_STATUS
-    last_payload = json.dumps(MACHINE_STATUS, sort_keys=True)
+    global MACHINE_STATUS, MACHINE_STATUS_PAYLOAD
+    # Everything except the IP list is fixed at boot, so the IPs alone decide
+    # whether a new machineStatus needs to be built and broadcast.
+    last_ips = tuple(MACHINE_STATUS.get("ips", []))
     while True:
         try:
-            next_state = build_machine_status()
-            next_payload = json.dumps(next_state, sort_keys=True)
-            if next_payload != last_payload:
-                MACHINE_STATUS = next_state
-                last_payload = next_payload
-                await broadcast(MACHINE_STATUS)
+            # Resolver + route lookups can block (mDNS, slow DHCP): keep them off the loop.
+            ips = await asyncio.to_thread(_get_all_ipv4, _STATIC_MACHINE_FIELDS["hostname"])
+            if tuple(ips) != last_ips:
+                last_ips = tuple(ips)
+                MACHINE_STATUS = build_machine_status(ips)
+                MACHINE_STATUS_PAYLOAD = _json_dumps(MACHINE_STATUS)
+                broadcast_payload(MACHINE_STATUS_PAYLOAD)
         except Exception:
             pass
         await asyncio.sleep(5.0)
 
 
+def _handle_client_message(ws, raw) -> None:
+    try:
+        msg = _json_loads(raw)
+    except Exception:
+        return
+    if not isinstance(msg, dict):
+        return
+
+    msg_type = msg.get("type")
+    if msg_type == "hello" and isinstance(msg.get("engineSlots"), list):
+        engines = frozenset(str(e).strip().upper() for e in msg["engineSlots"]) & frozenset(ENGINE_SLOTS)
+    elif msg_type == "subscribe" and msg.get("engine") is not None:
+        engine = str(msg.get("engine")).strip().upper()
+        engines = CLIENT_ENGINES.get(ws, frozenset()) | ({engine} & frozenset(ENGINE_SLOTS))
+    else:
+        return
+
+    if engines:
+        CLIENT_ENGINES[ws] = engines
+    else:
+        CLIENT_ENGINES.pop(ws, None)
+    log.debug("📥 WS client %x serves engines: %s", id(ws), sorted(engines) if engines else "ALL")
+
+
 async def ws_handler(ws):
-    client = f"{ws.remote_address}"
     client_id = f"{id(ws):x}"
-    CLIENTS.add(ws)
-    log.info(f"🔗 WS client connected: {client} (id={client_id})")
-
-    try:
-        await ws.send(json.dumps(SERVER_VERSION_MSG))
-        await ws.send(json.dumps(MACHINE_STATUS))
-        await ws.send(json.dumps(current_controller_status()))
-    except Exception as e:
-        log.debug(f"⚠️ Could not send initial status to {client_id}: {e}")
+    queue: asyncio.Queue = asyncio.Queue(maxsize=WS_CLIENT_SEND_QUEUE_MAX)
+    # The initial burst goes through the client's queue too, so it is always
+    # delivered before any broadcast queued after registration.
+    queue.put_nowait(SERVER_VERSION_PAYLOAD)
+    queue.put_nowait(MACHINE_STATUS_PAYLOAD)
+    queue.put_nowait(CONTROLLER_STATUS_PAYLOAD)
+    _add_client(ws, queue)
+    writer = asyncio.create_task(_client_writer(ws, queue))
+    log.info("🔗 WS client connected: %s (id=%s)", ws.remote_address, client_id)
 
     try:
         async for raw in ws:
-            log.debug(f"📥 WS from {client_id}: {raw}")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("📥 WS from %s: %s", client_id, raw)
+            _handle_client_message(ws, raw)
     except websockets.exceptions.ConnectionClosed as e:
-        log.info(f"🔌 WS client disconnected: {client_id} code={e.code} reason={e.reason}")
+        log.info("🔌 WS client disconnected: %s code=%s reason=%s", client_id, e.code, e.reason)
     finally:
-        CLIENTS.discard(ws)
+        _remove_clients((ws,))
+        writer.cancel()
 
 
 # =========================
 # Serial device handling
 # =========================
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ControllerInfo:
     port: str
     device_id: str
     device_type: str
     fw: str
+    port_name: str  # basename of port, for log lines
 
 
 def _write_json_line(ser: serial.Serial, message: dict) -> None:
-    line = (json.dumps(message) + "\n").encode("utf-8")
-    ser.write(line)
+    ser.write(_json_dumps_line(message))
     ser.flush()
 
 
 def _read_json_line(ser: serial.Serial, *, timeout_sec: float) -> Optional[dict]:
-    start = time.time()
-    while (time.time() - start) < timeout_sec:
-        raw = ser.readline()
-        if not raw:
-            continue
+    # pyserial enforces ser.timeout inside read_until(), so this loops once per
+    # received line rather than polling readline() every 100ms. The port is
+    # opened with timeout=timeout_sec; it is only shortened after noise lines.
+    deadline = time.monotonic() + timeout_sec
+    while True:
+        raw = ser.read_until(b"\n", SERIAL_PROBE_MAX_LINE).strip()
+        if raw and log.isEnabledFor(logging.DEBUG):
+            # Lines stay bytes end-to-end; decode only for an emitted log record.
+            log.debug("🧪 RX <- %s: %s", ser.port, raw.decode("utf-8", errors="replace"))
+
+        # Non-JSON noise (e.g. boot/debug prints) is rejected on the bytes,
+        # without a decode or a parse exception.
+        if raw[:1] == b"{":
+            try:
+                return _json_loads(raw)
+            except Exception:
+                pass
 
-        text = raw.decode("utf-8", errors="replace").strip()
-        if text:
-            log.debug(f"🧪 RX <- {ser.port}: {text}")
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        ser.timeout = remaining
 
-        if not text.startswith("{"):
-            continue
 
-        try:
-            return json.loads(text)
-        except Exception:
-            continue
-    return None
+# A successful probe returns the port still open: serial_port_task reads from the
+# same handle instead of closing and reopening it (a reopen can toggle DTR and
+# reset some boards, and drops anything already buffered after the hello).
+ProbeHit = Tuple[ControllerInfo, serial.Serial]
 
 
-def _probe_port_for_controller(port: str) -> Optional[ControllerInfo]:
+def _probe_port_for_controller(port: str) -> Optional[ProbeHit]:
     try:
-        ser = serial.Serial(port=port, baudrate=SERIAL_BAUD, timeout=0.1)
+        ser = serial.Serial(port=port, baudrate=SERIAL_BAUD, timeout=SERIAL_PROBE_TIMEOUT_SEC)
     except Exception as e:
-        log.debug(f"🧪 Probe open failed: {port} ({e})")
+        log.debug("🧪 Probe open failed: %s (%s)", port, e)
         return None
 
+    hit: Optional[ProbeHit] = None
     try:
-        log.debug(f"🧪 Probing serial port: {port}")
+        log.debug("🧪 Probing serial port: %s", port)
         probe_msg = {"type": "whoareyou"}
-        log.debug(f"🧪 TX -> {port}: {probe_msg}")
+        log.debug("🧪 TX -> %s: %s", port, probe_msg)
         _write_json_line(ser, probe_msg)
 
         msg = _read_json_line(ser, timeout_sec=SERIAL_PROBE_TIMEOUT_SEC)
         if not msg:
-            log.debug(f"🧪 No response on: {port}")
+            log.debug("🧪 No response on: %s", port)
             return None
 
         if msg.get("type") != "hello":
-            log.debug(f"🧪 Unexpected response on {port}: {msg}")
+            log.debug("🧪 Unexpected response on %s: %s", port, msg)
             return None
 
         device_type = str(msg.get("deviceType", ""))
@@ -558,29 +773,151 @@ def _probe_port_for_controller(port: str) -> Optional[ControllerInfo]:
         fw = str(msg.get("fw", ""))
 
         if device_type != TARGET_DEVICE_TYPE:
-            log.debug(f"🧪 Not our deviceType on {port}: {device_type}")
+            log.debug("🧪 Not our deviceType on %s: %s", port, device_type)
             return None
 
         if STRICT_DEVICE_ID_ALLOWLIST and device_id not in DEVICE_ID_ALLOWLIST:
-            log.info(f"🛑 Ignoring controller on {port} with unexpected deviceId={device_id}")
+            log.info("🛑 Ignoring controller on %s with unexpected deviceId=%s", port, device_id)
             return None
 
-        log.info(f"✅ Found controller on {port}: deviceId={device_id} fw={fw}")
-        return ControllerInfo(port=port, device_id=device_id, device_type=device_type, fw=fw)
+        log.info("✅ Found controller on %s: deviceId=%s fw=%s", port, device_id, fw)
+        info = ControllerInfo(
+            port=port,
+            device_id=device_id,
+            device_type=device_type,
+            fw=fw,
+            port_name=os.path.basename(port),
+        )
+        hit = (info, ser)
+        return hit
 
     except Exception as e:
-        log.debug(f"🧪 Probe error on {port}: {e}")
+        log.debug("🧪 Probe error on %s: %s", port, e)
         return None
     finally:
+        if hit is None:
+            try:
+                ser.close()
+            except Exception:
+                pass
+
+
+def _serial_reader_thread(
+    ser: serial.Serial,
+    loop: asyncio.AbstractEventLoop,
+    queue: asyncio.Queue,
+    slots: threading.Semaphore,
+    stop: threading.Event,
+) -> None:
+    """Blocking serial read loop for one controller connection (own thread).
+
+    Waits for one byte (bounded by ser.timeout), then drains everything the
+    driver already has with a single read(in_waiting) and splits complete
+    lines locally, instead of readline()'s byte-at-a-time reads. Each wakeup
+    hands one list of lines to the event loop; a read timeout hands over an
+    empty list so the consumer keeps its periodic work ticking.
+
+    `slots` bounds the number of queued batches; a read error is queued as the
+    exception object itself so serial_port_task can handle the disconnect.
+    """
+    buf = bytearray()
+    try:
+        while not stop.is_set():
+            chunk = ser.read(1)
+            if chunk:
+                buf += chunk
+                waiting = ser.in_waiting
+                if waiting:
+                    buf += ser.read(waiting)
+
+            lines: list[bytes] = []
+            start = 0
+            while True:
+                nl = buf.find(b"\n", start)
+                if nl < 0:
+                    break
+                lines.append(bytes(buf[start:nl]))
+                start = nl + 1
+            if start:
+                del buf[:start]
+
+            if chunk and not lines:
+                # Partial line only; keep reading until it completes.
+                continue
+
+            while not slots.acquire(timeout=0.2):
+                if stop.is_set():
+                    return
+            loop.call_soon_threadsafe(queue.put_nowait, lines)
+    except Exception as e:
+        if stop.is_set():
+            return
         try:
-            ser.close()
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        except RuntimeError:
+            # Event loop already closed (shutdown).
+            pass
+
+
+# One lock per port so a port is never probed twice at the same time (a slow
+# probe from a previous scan may still be running when the next scan starts).
+_PROBE_LOCKS: Dict[str, threading.Lock] = {}
+
+
+def _probe_port_exclusive(port: str) -> Optional[ProbeHit]:
+    lock = _PROBE_LOCKS.setdefault(port, threading.Lock())
+    if not lock.acquire(blocking=False):
+        log.debug("🧪 Probe already running on %s, skipping", port)
+        return None
+    try:
+        return _probe_port_for_controller(port)
+    finally:
+        lock.release()
+
+
+def _close_unclaimed_probe(probe: asyncio.Future, keep: Optional[ProbeHit]) -> None:
+    # Any probe hit other than the one handed to serial_port_task (e.g. a second
+    # port answering after we already picked one).
+    if probe.cancelled() or probe.exception() is not None:
+        return
+    hit = probe.result()
+    if hit and hit is not keep:
+        try:
+            hit[1].close()
         except Exception:
             pass
 
 
-def _list_candidate_ports() -> list[str]:
-    ports = [p.device for p in serial.tools.list_ports.comports()]
-    return [port for port in ports if port not in SERIAL_PORT_EXCLUDE]
+async def _probe_ports(ports: Tuple[str, ...]) -> Optional[ProbeHit]:
+    """Probe all candidate ports concurrently and return the first controller found.
+
+    A scan takes about one SERIAL_PROBE_TIMEOUT_SEC instead of one per port.
+    Probes still running when a controller answers finish on their own timeout
+    in the background; any port they opened is closed again.
+    """
+    if not ports:
+        return None
+
+    probes = [asyncio.ensure_future(asyncio.to_thread(_probe_port_exclusive, port)) for port in ports]
+    winner: Optional[ProbeHit] = None
+    try:
+        for next_done in asyncio.as_completed(probes):
+            hit = await next_done
+            if hit:
+                winner = hit
+                return hit
+        return None
+    finally:
+        # The worker threads can't be interrupted, so let them finish and only
+        # close what they hand back (a cancelled to_thread would drop it).
+        for probe in probes:
+            probe.add_done_callback(lambda p: _close_unclaimed_probe(p, winner))
+
+
+def _list_candidate_ports() -> Tuple[str, ...]:
+    # comports() walks sysfs/IOKit; serial_manager_task only calls this while no
+    # controller is attached.
+    return tuple(p.device for p in serial.tools.list_ports.comports() if p.device not in SERIAL_PORT_EXCLUDE)
 
 
 # =========================
@@ -592,6 +929,9 @@ SERIAL_TASK: Optional[asyncio.Task] = None
 # Last time (monotonic seconds) we observed a controller->server "rate" set for each channel.
 # Used to infer whether an activity encoder is actively sending (traffic seen recently).
 LAST_RATE_RX_MONO: Dict[str, float] = {}
+# Set when an encoder comes online or the controller (dis)connects, so
+# encoder_traffic_status_task wakes up early instead of polling.
+ENCODER_STATUS_WAKE = asyncio.Event()
 
 
 def _now_mono() -> float:
@@ -599,9 +939,10 @@ def _now_mono() -> float:
     return time.monotonic()
 
 
-def _build_encoder_traffic_status() -> dict:
+def _build_encoder_traffic_status(now: Optional[float] = None) -> dict:
     """Build per-channel encoder traffic status based on recent 'rate' messages."""
-    now = _now_mono()
+    if now is None:
+        now = _now_mono()
     encoders: dict = {}
 
     for ch in ENGINE_SLOTS:
@@ -632,11 +973,11 @@ def _format_encoder_channels(channels: dict) -> str:
     return " | ".join(parts)
 
 
-def current_controller_status() -> dict:
+def current_controller_status(now: Optional[float] = None) -> dict:
     if not CONTROLLER:
         return {"type": "controllerStatus", "connected": False, "engines": ENGINE_SLOTS}
 
-    encoders = _build_encoder_traffic_status()
+    encoders = _build_encoder_traffic_status(now)
 
     # Attach SSOT encoder deviceId (if available)
     try:
@@ -661,18 +1002,42 @@ def current_controller_status() -> dict:
     }
 
 
+# controllerStatus with no controller attached only depends on ENGINE_SLOTS, so
+# it is encoded once (main() rebuilds it after applying --engine-count/--slot).
+DISCONNECTED_STATUS_PAYLOAD: str = _json_dumps(current_controller_status())
+
+# controllerStatus exactly as last broadcast (re-encoded at every broadcast, i.e.
+# on connect/disconnect, encoder flips and the periodic refresh), so new WS
+# clients get the same snapshot without an encode per connection.
+CONTROLLER_STATUS_PAYLOAD: str = DISCONNECTED_STATUS_PAYLOAD
+
+
+def publish_controller_status(status: Optional[dict] = None) -> None:
+    global CONTROLLER_STATUS_PAYLOAD
+    if status is None and CONTROLLER:
+        status = current_controller_status()
+    if status and status.get("connected"):
+        CONTROLLER_STATUS_PAYLOAD = _json_dumps(status)
+    else:
+        CONTROLLER_STATUS_PAYLOAD = DISCONNECTED_STATUS_PAYLOAD
+    broadcast_payload(CONTROLLER_STATUS_PAYLOAD)
+
+
 async def controller_heartbeat_task():
     while True:
         try:
             if CONTROLLER:
-                port_name = Path(CONTROLLER.port).name
                 log.info(
-                    f"💓 Controller alive: ✅({CONTROLLER.device_id}@{port_name} fw={CONTROLLER.fw}) engines={ENGINE_SLOTS}"
+                    "💓 Controller alive: ✅(%s@%s fw=%s) engines=%s",
+                    CONTROLLER.device_id,
+                    CONTROLLER.port_name,
+                    CONTROLLER.fw,
+                    ENGINE_SLOTS,
                 )
             else:
                 log.info("💓 Controller alive: —")
         except Exception as e:
-            log.debug(f"⚠️ controller_heartbeat_task loop error: {e}")
+            log.debug("⚠️ controller_heartbeat_task loop error: %s", e)
 
         await asyncio.sleep(HEARTBEAT_INTERVAL_SEC)
 
@@ -682,6 +1047,10 @@ async def encoder_traffic_status_task():
 
     We broadcast immediately when an online flag flips (A/B), and also re-broadcast
     at a low refresh rate so the UI can show ageMs progressing if it wants.
+
+    Instead of polling, the task sleeps until the earliest of: the next refresh,
+    the next encoder going OFFLINE (last rate + timeout), or ENCODER_STATUS_WAKE
+    (set by the serial loop when an encoder comes online).
     """
     last_online: Optional[Dict[str, bool]] = None
     last_connected: Optional[bool] = None
@@ -689,103 +1058,106 @@ async def encoder_traffic_status_task():
 
     while True:
         try:
-            status = current_controller_status()
+            now = _now_mono()
+            status = current_controller_status(now)
             connected = bool(status.get("connected", False))
             enc = status.get("encoders", {}).get("channels", {})
             online = {ch: bool(enc.get(ch, {}).get("online", False)) for ch in ENGINE_SLOTS}
 
-            now = _now_mono()
-            refresh_due = (now - last_broadcast_mono) >= 5.0
+            refresh_due = (now - last_broadcast_mono) >= ENCODER_STATUS_REFRESH_SEC
             flipped = (last_online is None) or (online != last_online)
             controller_changed = (last_connected is None) or (connected != last_connected)
 
             if flipped or refresh_due or controller_changed:
                 # ✅ Log encoder traffic status so it's visible in your server logs
                 # when the controller disconnects or when encoder online flags flip.
-                log.debug(
-                    "📡 controllerStatus(encoders): controller connected=%s | encoders: %s",
-                    "YES" if connected else "NO",
-                    _format_encoder_channels(enc),
-                )
-
-                await broadcast(status)
+                # (Guarded: the channel summary is built eagerly, not by logging.)
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug(
+                        "📡 controllerStatus(encoders): controller connected=%s | encoders: %s",
+                        "YES" if connected else "NO",
+                        _format_encoder_channels(enc),
+                    )
+
+                publish_controller_status(status)
                 last_online = online
                 last_connected = connected
                 last_broadcast_mono = now
 
+            next_due = last_broadcast_mono + ENCODER_STATUS_REFRESH_SEC
+            for last in LAST_RATE_RX_MONO.values():
+                # Small margin so we wake just after the channel is past its timeout.
+                expires = last + ENCODER_OFFLINE_TIMEOUT_SEC + 0.01
+                if now < expires < next_due:
+                    next_due = expires
+            wait_sec = max(0.0, next_due - now)
+
         except Exception as e:
-            log.debug(f"⚠️ encoder_traffic_status_task loop error: {e}")
+            log.debug("⚠️ encoder_traffic_status_task loop error: %s", e)
+            wait_sec = ENCODER_STATUS_POLL_SEC
 
-        await asyncio.sleep(ENCODER_STATUS_POLL_SEC)
+        ENCODER_STATUS_WAKE.clear()
+        try:
+            await asyncio.wait_for(ENCODER_STATUS_WAKE.wait(), timeout=wait_sec)
+        except asyncio.TimeoutError:
+            pass
 
 
-def _normalize_set_value(msg: dict) -> None:
-    key = str(msg.get("key", ""))
-    if "value" not in msg:
-        return
+# Value coercion per set key; unknown keys pass their value through unchanged.
+_COERCE: Dict[str, Callable[[object], object]] = {"volume": int, "tone": int, "rate": float}
 
-    raw_val = msg.get("value")
-    if key in ("volume", "tone"):
-        try:
-            msg["value"] = int(raw_val)
-        except Exception:
-            pass
-    elif key == "rate":
-        try:
-            msg["value"] = float(raw_val)
-        except Exception:
-            pass
+# The exact shape the controller firmware emits for encoder updates, e.g.
+#   {"type":"set","channel":"A","key":"volume","value":7}
+# Lines matching it skip the generic JSON parse; anything else falls back to it.
+_SET_RE = re.compile(rb'\{"type":"set","channel":"([A-Z])","key":"([a-z]+)","value":(-?(?:0|[1-9]\d*)(?:\.\d+)?)\}')
 
 
-async def serial_port_task(info: ControllerInfo):
+async def serial_port_task(info: ControllerInfo, ser: serial.Serial):
     global CONTROLLER
 
     port = info.port
-    try:
-        ser = serial.Serial(port=port, baudrate=SERIAL_BAUD, timeout=0.2)
-    except Exception as e:
-        log.warning(f"⚠️ Could not open controller port {port}: {e}")
-        return
+    # Handle comes open from the probe; switch to the reader thread's poll timeout.
+    ser.timeout = 0.2
 
-    log.info(f"🎛️ Controller connected on {port} (deviceId={info.device_id})")
+    log.info("🎛️ Controller connected on %s (deviceId=%s)", port, info.device_id)
     CONTROLLER = info
     # Reset encoder traffic timestamps on (re)connect so we don't show stale "online".
     LAST_RATE_RX_MONO.clear()
-    await broadcast(current_controller_status())
+    ENCODER_STATUS_WAKE.set()
+    publish_controller_status()
     # Helpful: show initial status in logs (debug level)
-    try:
-        enc = current_controller_status().get("encoders", {}).get("channels", {})
-        log.debug(
-            "📡 controllerStatus(encoders): controller connected=YES | encoders: %s",
-            _format_encoder_channels(enc),
-        )
-    except Exception:
-        pass
+    if log.isEnabledFor(logging.DEBUG):
+        try:
+            enc = current_controller_status().get("encoders", {}).get("channels", {})
+            log.debug(
+                "📡 controllerStatus(encoders): controller connected=YES | encoders: %s",
+                _format_encoder_channels(enc),
+            )
+        except Exception:
+            pass
 
     # Digest accumulators
-    digest_started = time.time()
-    last_digest = time.time()
+    digest_on = SERIAL_LOG_MODE == "digest"
+    digest_started = time.monotonic()
+    next_digest_at = digest_started + SERIAL_LOG_DIGEST_EVERY_SEC
     line_count = 0
     json_count = 0
     set_count = 0
-    set_key_counts: Dict[str, int] = {}
+    set_key_counts: Counter = Counter()
     last_set_values: Dict[str, object] = {}
 
-    def _emit_digest(force: bool = False) -> None:
-        nonlocal last_digest, line_count, json_count, set_count, set_key_counts, last_set_values, digest_started
-        if SERIAL_LOG_MODE != "digest":
-            return
-
-        now = time.time()
-        if not force and (now - last_digest) < SERIAL_LOG_DIGEST_EVERY_SEC:
-            return
+    def _emit_digest() -> None:
+        # Called once the digest deadline has passed (or on disconnect); the
+        # read loop only compares a float per batch until then.
+        nonlocal next_digest_at, line_count, json_count, set_count, set_key_counts, last_set_values, digest_started
+        now = time.monotonic()
+        next_digest_at = now + SERIAL_LOG_DIGEST_EVERY_SEC
 
         if line_count <= 0:
-            last_digest = now
             return
 
-        keys_sorted = sorted(set_key_counts.items(), key=lambda kv: kv[1], reverse=True)
-        keys_sorted = keys_sorted[: max(1, SERIAL_LOG_MAX_KEYS_IN_DIGEST)]
+        # most_common(n) uses a heap: O(K log n) instead of sorting every key.
+        keys_sorted = set_key_counts.most_common(max(1, SERIAL_LOG_MAX_KEYS_IN_DIGEST))
         parts = []
         for k, n in keys_sorted:
             last_val = last_set_values.get(k, None)
@@ -793,77 +1165,229 @@ async def serial_port_task(info: ControllerInfo):
 
         age = now - digest_started
         key_part = " · " + " | ".join(parts) if parts else ""
-        log.debug(f"📟 SERIAL {port}: {line_count} lines ({json_count} json, {set_count} set) in {age:.1f}s{key_part}")
+        log.debug(
+            "📟 SERIAL %s: %d lines (%d json, %d set) in %.1fs%s",
+            port,
+            line_count,
+            json_count,
+            set_count,
+            age,
+            key_part,
+        )
 
-        last_digest = now
         digest_started = now
         line_count = 0
         json_count = 0
         set_count = 0
-        set_key_counts = {}
+        set_key_counts = Counter()
         last_set_values = {}
 
-    try:
-        while True:
-            raw = await asyncio.to_thread(ser.readline)
-            if not raw:
-                _emit_digest(force=False)
-                continue
-
-            text = raw.decode("utf-8", errors="replace").strip()
-            if not text:
-                _emit_digest(force=False)
-                continue
-
-            line_count += 1
-            if SERIAL_LOG_MODE == "full":
-                log.debug(f"📟 SERIAL {port}: {text}")
-
-            try:
-                msg = json.loads(text)
-                json_count += 1
-            except Exception:
-                _emit_digest(force=False)
-                continue
+    # One long-lived reader thread per connection instead of a thread-pool
+    # dispatch (asyncio.to_thread) for every single line.
+    rx_queue: asyncio.Queue = asyncio.Queue()
+    rx_slots = threading.Semaphore(SERIAL_RX_QUEUE_MAX)
+    rx_stop = threading.Event()
+    rx_thread = threading.Thread(
+        target=_serial_reader_thread,
+        args=(ser, asyncio.get_running_loop(), rx_queue, rx_slots, rx_stop),
+        name=f"serial-rx {port}",
+        daemon=True,
+    )
+    rx_thread.start()
+
+    # Per-line hot loop: bind module globals / attributes to locals once.
+    json_loads = _json_loads
+    json_dumps = _json_dumps
+    send = broadcast
+    send_payload = broadcast_payload
+    set_match = _SET_RE.fullmatch
+    coercers = _COERCE
+    now_mono = _now_mono
+    last_rate_rx = LAST_RATE_RX_MONO
+    encoder_wake = ENCODER_STATUS_WAKE
+    engines = frozenset(ENGINE_SLOTS)
+    log_full = SERIAL_LOG_MODE == "full"
+
+    def _note_rate(channel: str, now: float) -> None:
+        # Encoder traffic detection:
+        # If we see a rate update for a channel, we consider that channel's encoder "online"
+        # for ENCODER_OFFLINE_TIMEOUT_SEC seconds. An OFF -> ON flip wakes the status task.
+        prev = last_rate_rx.get(channel)
+        last_rate_rx[channel] = now
+        if prev is None or (now - prev) > ENCODER_OFFLINE_TIMEOUT_SEC:
+            encoder_wake.set()
+
+    # Coalescing: latest pending "set" per (engine, key), flushed at most once
+    # per SET_COALESCE_INTERVAL_SEC. Dict order keeps first-seen key order.
+    # Values are either a message dict or an already-encoded payload (fast path).
+    pending_sets: Dict[tuple, object] = {}
+    flush_task: Optional[asyncio.Task] = None
+    last_flush_mono = 0.0
+
+    def _send_set(engine: str, out) -> None:
+        if isinstance(out, str):
+            send_payload(out, engine=engine)
+        else:
+            send(out, engine=engine)
 
-            if msg.get("type") != "set":
-                _emit_digest(force=False)
-                continue
+    def _flush_pending_sets() -> None:
+        nonlocal last_flush_mono
+        if not pending_sets:
+            return
+        batch = list(pending_sets.items())
+        pending_sets.clear()
+        last_flush_mono = now_mono()
+        for (engine, _key), out in batch:
+            _send_set(engine, out)
+
+    def _dispatch_set(engine: str, key: str, out) -> None:
+        nonlocal flush_task
+        if SET_COALESCE_INTERVAL_SEC > 0:
+            pending_sets[(engine, key)] = out
+            if flush_task is None:
+                flush_task = asyncio.create_task(_flush_pending_sets_later())
+        else:
+            _send_set(engine, out)
 
-            set_count += 1
+    async def _flush_pending_sets_later() -> None:
+        nonlocal flush_task
+        try:
+            await asyncio.sleep(max(0.0, last_flush_mono + SET_COALESCE_INTERVAL_SEC - now_mono()))
+            _flush_pending_sets()
+        finally:
+            flush_task = None
 
-            channel = str(msg.get("channel", "")).strip().upper()
-            if channel not in ENGINE_SLOTS:
-                # Ignore legacy messages without channel (or unknown channels)
-                _emit_digest(force=False)
+    try:
+        while True:
+            batch = await rx_queue.get()
+            rx_slots.release()
+            if isinstance(batch, Exception):
+                raise batch
+            # One clock read per batch: all its lines arrived in the same wakeup.
+            now = now_mono()
+            if digest_on and now >= next_digest_at:
+                _emit_digest()
+            if not batch:
                 continue
 
-            key = str(msg.get("key", ""))
-            if key:
-                set_key_counts[key] = set_key_counts.get(key, 0) + 1
-
-            _normalize_set_value(msg)
-
-            # Encoder traffic detection:
-            # If we see a rate update for a channel, we consider that channel's encoder "online"
-            # for ENCODER_OFFLINE_TIMEOUT_SEC seconds.
-            if key == "rate":
-                LAST_RATE_RX_MONO[channel] = _now_mono()
-
-            if key:
-                last_set_values[key] = msg.get("value")
+            # Per-line DEBUG logging decided once per batch (picks up level changes
+            # on the next batch) rather than re-checked for every line.
+            log_lines = log_full and log.isEnabledFor(logging.DEBUG)
+
+            for raw in batch:
+                raw = raw.strip()
+                if not raw:
+                    continue
+
+                line_count += 1
+                if log_lines:
+                    # Lines stay bytes end-to-end; decode only for an emitted log record.
+                    log.debug("📟 SERIAL %s: %s", port, raw.decode("utf-8", errors="replace"))
+
+                # Prefilter on the bytes: debug prints like "DBG volume=42" are
+                # skipped without going through the parser's exception path.
+                if raw[:1] != b"{":
+                    continue
+
+                # Fast path: the firmware's fixed set shape. No message dict is
+                # built; the outgoing payload is assembled directly as text in the
+                # same field order (and value formatting) as the generic path.
+                m = set_match(raw)
+                if m is not None:
+                    json_count += 1
+                    set_count += 1
+                    channel = m[1].decode("ascii")
+                    if channel not in engines:
+                        continue
 
-            # Web app compatibility: add engine, keep channel
-            msg.setdefault("channel", channel)
-            msg["engine"] = channel
+                    key = m[2].decode("ascii")
+                    set_key_counts[key] += 1
+                    try:
+                        value = json_loads(m[3])
+                    except ValueError:
+                        continue
+                    coerce = coercers.get(key)
+                    if coerce is not None:
+                        try:
+                            value = coerce(value)
+                        except Exception:
+                            pass
+
+                    if key == "rate":
+                        _note_rate(channel, now)
+                    last_set_values[key] = value
+
+                    payload = (
+                        f'{{"type":"set","channel":"{channel}","key":"{key}",'
+                        f'"value":{json_dumps(value)},"engine":"{channel}"}}'
+                    )
+                    _dispatch_set(channel, key, payload)
+                    continue
 
-            await broadcast(msg)
-            _emit_digest(force=False)
+                try:
+                    msg = json_loads(raw)
+                    json_count += 1
+                except Exception:
+                    continue
+
+                msg_get = msg.get
+                if msg_get("type") != "set":
+                    continue
+
+                set_count += 1
+
+                channel = str(msg_get("channel", "")).strip().upper()
+                if channel not in engines:
+                    # Ignore legacy messages without channel (or unknown channels)
+                    continue
+
+                key = str(msg_get("key", ""))
+                if key:
+                    set_key_counts[key] += 1
+
+                # Outgoing message is built from the known fields (same order as
+                # the fast path) instead of patching the parsed dict.
+                # Web app compatibility: add engine, keep channel as sent.
+                out = {"type": "set", "channel": msg_get("channel"), "key": key}
+                if "value" in msg:
+                    value = msg_get("value")
+                    coerce = coercers.get(key)
+                    if coerce is not None:
+                        try:
+                            value = coerce(value)
+                        except Exception:
+                            pass
+                    out["value"] = value
+                out["engine"] = channel
+
+                if key == "rate":
+                    _note_rate(channel, now)
+
+                if key:
+                    last_set_values[key] = out.get("value")
+
+                _dispatch_set(channel, key, out)
 
     except Exception as e:
-        log.warning(f"🔌 Controller disconnected / read error on {port}: {e}")
+        log.warning("🔌 Controller disconnected / read error on %s: %s", port, e)
     finally:
-        _emit_digest(force=True)
+        if digest_on:
+            _emit_digest()
+
+        # Deliver the last known values before announcing the disconnect.
+        if flush_task is not None:
+            flush_task.cancel()
+        try:
+            _flush_pending_sets()
+        except Exception:
+            pass
+
+        rx_stop.set()
+        try:
+            ser.cancel_read()
+        except Exception:
+            pass
+        await asyncio.to_thread(rx_thread.join, 1.0)
 
         try:
             ser.close()
@@ -872,17 +1396,29 @@ async def serial_port_task(info: ControllerInfo):
 
         CONTROLLER = None
         LAST_RATE_RX_MONO.clear()
+        ENCODER_STATUS_WAKE.set()
         # Log final status (debug) so disconnect is visible even if you only watch logs.
-        try:
-            enc = current_controller_status().get("encoders", {}).get("channels", {})
-            log.debug(
-                "📡 controllerStatus(encoders): controller connected=NO | encoders: %s",
-                _format_encoder_channels(enc),
-            )
-        except Exception:
-            pass
+        if log.isEnabledFor(logging.DEBUG):
+            try:
+                enc = current_controller_status().get("encoders", {}).get("channels", {})
+                log.debug(
+                    "📡 controllerStatus(encoders): controller connected=NO | encoders: %s",
+                    _format_encoder_channels(enc),
+                )
+            except Exception:
+                pass
 
-        await broadcast(current_controller_status())
+        publish_controller_status()
+
+
+def _on_serial_task_done(task: asyncio.Task) -> None:
+    # Runs as soon as the connection task ends: frees the slot for the next scan
+    # and surfaces unexpected crashes instead of leaving them in a finished task.
+    global SERIAL_TASK
+    if SERIAL_TASK is task:
+        SERIAL_TASK = None
+    if not task.cancelled() and task.exception() is not None:
+        log.warning("⚠️ serial_port_task ended with error: %s", task.exception())
 
 
 async def serial_manager_task():
@@ -890,39 +1426,36 @@ async def serial_manager_task():
 
     while True:
         try:
-            if SERIAL_TASK and SERIAL_TASK.done():
-                try:
-                    _ = SERIAL_TASK.result()
-                except Exception:
-                    pass
-                SERIAL_TASK = None
+            if SERIAL_TASK:
+                # Attached: nothing to scan. Sleep until the connection ends instead
+                # of waking every SERIAL_SCAN_INTERVAL_SEC (the done callback clears it).
+                await asyncio.wait((SERIAL_TASK,))
 
             if not SERIAL_TASK:
                 ports = _list_candidate_ports()
-                log.debug(f"🔎 Serial scan: {ports}")
+                log.debug("🔎 Serial scan: %s", ports)
 
-                for port in ports:
-                    info = await asyncio.to_thread(_probe_port_for_controller, port)
-                    if not info:
-                        continue
-
-                    SERIAL_TASK = asyncio.create_task(serial_port_task(info))
-                    break
+                hit = await _probe_ports(ports)
+                if hit:
+                    SERIAL_TASK = asyncio.create_task(serial_port_task(*hit))
+                    SERIAL_TASK.add_done_callback(_on_serial_task_done)
 
         except Exception as e:
-            log.debug(f"⚠️ serial_manager_task loop error: {e}")
+            log.debug("⚠️ serial_manager_task loop error: %s", e)
 
         await asyncio.sleep(SERIAL_SCAN_INTERVAL_SEC)
 
 
 async def main():
-    global ENGINE_SLOTS, WS_HOST, WS_PORT
+    global ENGINE_SLOTS, WS_HOST, WS_PORT, CONTROLLER_STATUS_PAYLOAD, DISCONNECTED_STATUS_PAYLOAD
 
     args = _parse_args()
     WS_HOST = args.ws_host
     WS_PORT = args.ws_port
     ENGINE_SLOTS = [args.slot] if args.engine_count == 1 else ["A", "B"]
-
+    DISCONNECTED_STATUS_PAYLOAD = _json_dumps(current_controller_status())
+    CONTROLLER_STATUS_PAYLOAD = DISCONNECTED_STATUS_PAYLOAD
+    await _load_boot_status()
 
     # Startup banner is printed at a configurable level, then we switch to run log level (quiet by default).
     _set_run_log_level(args.startup_log_level)
@@ -940,22 +1473,43 @@ async def main():
     # One-time startup diagnostics (includes topology summary at INFO level).
     _log_startup_debug()
 
-    async with websockets.serve(ws_handler, WS_HOST, WS_PORT):
+    # Frames are tiny JSON messages: permessage-deflate costs more CPU than it
+    # saves, and clients only ever send small hello/subscribe messages, so keep
+    # the per-connection receive buffer small too (same bounds as server.py).
+    async with websockets.serve(
+        ws_handler,
+        WS_HOST,
+        WS_PORT,
+        compression=None,
+        max_size=2**16,
+        max_queue=16,
+    ):
         log.info("✅ WebSocket server started")
 
         # After startup, switch to run log level (quiet by default)
         _set_run_log_level(args.run_log_level)
 
-        await asyncio.gather(
-            asyncio.create_task(serial_manager_task()),
-            asyncio.create_task(machine_status_task()),
-            asyncio.create_task(controller_heartbeat_task()),
-            asyncio.create_task(encoder_traffic_status_task()),
-        )
+        # If one background task dies, TaskGroup cancels the others and re-raises.
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(serial_manager_task())
+            tg.create_task(machine_status_task())
+            tg.create_task(controller_heartbeat_task())
+            tg.create_task(encoder_traffic_status_task())
+
+
+def _run(coro) -> None:
+    # uvloop.run() exists since uvloop 0.18; older releases only have install().
+    if uvloop is None:
+        asyncio.run(coro)
+    elif hasattr(uvloop, "run"):
+        uvloop.run(coro)
+    else:
+        uvloop.install()
+        asyncio.run(coro)
 
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        _run(main())
     except KeyboardInterrupt:
         pass
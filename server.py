@@ -1,34 +1,84 @@
 import asyncio
 import json
 import logging
+import os
 import time
 import socket
 import platform
 import getpass
+import threading
+import re
 from pathlib import Path
-from dataclasses import dataclass
-from typing import Optional, Set
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import FrozenSet, Optional, Tuple
 
 import websockets
 import serial
 import serial.tools.list_ports
 
+# Optional accelerator: orjson (pip install orjson). Falls back to stdlib json.
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
+# Optional accelerator: uvloop (pip install uvloop, POSIX only). Falls back to asyncio's loop.
+try:
+    import uvloop  # type: ignore
+except ImportError:
+    uvloop = None
+
+# Optional: pyudev (pip install pyudev, Linux only) wakes the serial scan on hotplug.
+try:
+    import pyudev  # type: ignore
+except ImportError:
+    pyudev = None
+
 
 # =========================
 # Config
 # =========================
 WS_HOST = "localhost"
 WS_PORT = 8765
+# Outgoing messages buffered per WS client; when a client falls behind, its
+# oldest queued message is dropped so it still converges on the latest state.
+WS_CLIENT_SEND_QUEUE_MAX = 16
 
 SERIAL_BAUD = 115200
-SERIAL_SCAN_INTERVAL_SEC = 2.0
+# Idle rescans back off from MIN to MAX while no controller is found; a udev
+# tty hotplug event (when pyudev is installed) triggers a rescan immediately.
+SERIAL_SCAN_MIN_INTERVAL_SEC = 0.5
+SERIAL_SCAN_MAX_INTERVAL_SEC = 4.0
 SERIAL_PROBE_TIMEOUT_SEC = 1.0
+# Line batches buffered between the serial reader thread and the asyncio loop;
+# when full, the oldest batch is dropped so the latest controller values win.
+SERIAL_RX_QUEUE_MAX = 256
+# Ports probed at the same time (each probe holds one open file descriptor).
+SERIAL_PROBE_CONCURRENCY = 4
+
+# Controller "set" lines arriving within this window are sent to WS clients as
+# one frame; only the latest value per key is kept.
+SET_BATCH_WINDOW_SEC = 0.015
 
 # Match rules (adjust to your taste)
 TARGET_DEVICE_TYPE = "bauklank-controller"
 # If you only have one controller, you can leave TARGET_DEVICE_ID = None
 TARGET_DEVICE_ID = None  # e.g. "ctrl-01"
 
+# Optionally only probe ports behind the USB-serial bridges ESP8266/ESP32 boards
+# ship with, so built-in UARTs, Bluetooth ports etc. are never opened.
+# (vid, pid); pid None = any product. Off by default: a controller behind a bridge
+# missing from this list would silently never be found. Skipped ports are logged.
+SERIAL_FILTER_USB_IDS = False
+SERIAL_USB_IDS: FrozenSet[Tuple[int, Optional[int]]] = frozenset({
+    (0x10C4, 0xEA60),  # Silicon Labs CP210x
+    (0x1A86, 0x7523),  # WCH CH340
+    (0x1A86, 0x55D4),  # WCH CH9102
+    (0x0403, 0x6001),  # FTDI FT232R
+    (0x303A, None),    # Espressif native USB (ESP32-S2/S3/C3)
+})
+
 
 # =========================
 # Logging
@@ -41,6 +91,40 @@ logging.basicConfig(
 logging.getLogger("websockets").setLevel(logging.INFO)
 log = logging.getLogger("ws-server")
 
+# Per-line serial logging is off unless SERIAL_DEBUG=1: the read loop then keeps
+# the most recent lines in a ring buffer and logs them when the controller drops,
+# instead of streaming every line through logging.
+SERIAL_DEBUG = os.environ.get("SERIAL_DEBUG") == "1"
+SERIAL_DEBUG_RING_SIZE = 1000
+
+# =========================
+# JSON (orjson when available)
+# =========================
+# Every forwarded controller line is decoded and re-encoded, so use orjson there
+# when installed. Encoded payloads stay `str` so websockets keeps sending text
+# frames (the web app does JSON.parse(evt.data)).
+if orjson is not None:
+    JSON_BACKEND = "orjson"
+
+    def _json_dumps(message) -> str:
+        return orjson.dumps(message).decode("utf-8")
+
+    def _json_dumps_line(message) -> bytes:
+        return orjson.dumps(message) + b"\n"
+
+    _json_loads = orjson.loads
+else:
+    JSON_BACKEND = "json"
+
+    def _json_dumps(message) -> str:
+        return json.dumps(message)
+
+    def _json_dumps_line(message) -> bytes:
+        return (json.dumps(message) + "\n").encode("utf-8")
+
+    _json_loads = json.loads
+
+
 # =========================
 # Version
 # =========================
@@ -59,6 +143,7 @@ SERVER_STATE: dict = {
     "type": "server",
     "version": load_server_version(),
 }
+SERVER_STATE_JSON: str = _json_dumps(SERVER_STATE)
 
 # =========================
 # Machine info (for status bar)
@@ -140,95 +225,214 @@ def build_machine_state() -> dict:
 
 
 MACHINE_STATE: dict = build_machine_state()
+MACHINE_STATE_JSON: str = _json_dumps(MACHINE_STATE)
 
 
 
 # =========================
 # WebSocket client registry
 # =========================
-CLIENTS: Set[websockets.WebSocketServerProtocol] = set()
+# Copy-on-write list: connect/disconnect rebind CLIENTS to a new list instead of
+# mutating it, so broadcasts iterate a stable list without taking a snapshot copy.
+CLIENTS: list[websockets.WebSocketServerProtocol] = []
 
 # Cached controller state (so new WS clients immediately see current status)
 # Shape:
 #   {"type":"controller","status":"disconnected"}
 # or
 #   {"type":"controller","status":"connected","port":"...","deviceId":"...","fw":"..."}
-CONTROLLER_STATE: dict = {
-    "type": "controller",
-    "status": "disconnected",
-}
+@dataclass(frozen=True, slots=True)
+class ControllerState:
+    status: str = "disconnected"
+    port: Optional[str] = None
+    device_id: Optional[str] = None
+    fw: Optional[str] = None
 
+    def to_message(self) -> dict:
+        msg = {"type": "controller", "status": self.status}
+        if self.port is not None:
+            msg["port"] = self.port
+        if self.device_id is not None:
+            msg["deviceId"] = self.device_id
+        if self.fw is not None:
+            msg["fw"] = self.fw
+        return msg
 
 
-async def broadcast(message: dict):
-    if not CLIENTS:
-        return
-    payload = json.dumps(message)
-    dead = []
-    for ws in CLIENTS:
-        try:
+# Immutable snapshot, swapped on change; its JSON is encoded once per change and
+# reused by new clients and broadcasts.
+CONTROLLER_STATE = ControllerState()
+CONTROLLER_STATE_JSON: str = _json_dumps(CONTROLLER_STATE.to_message())
+
+
+# Outgoing payloads per client; drained by that client's _client_writer task.
+CLIENT_QUEUES: dict[object, asyncio.Queue] = {}
+
+
+def _put_drop_oldest(queue: asyncio.Queue, item) -> None:
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(item)
+
+
+def _add_client(ws, queue: asyncio.Queue) -> None:
+    global CLIENTS
+    CLIENT_QUEUES[ws] = queue
+    CLIENTS = [*CLIENTS, ws]
+
+
+def _remove_client(ws) -> None:
+    global CLIENTS
+    CLIENT_QUEUES.pop(ws, None)
+    if ws in CLIENTS:
+        CLIENTS = [c for c in CLIENTS if c is not ws]
+
+
+async def _client_writer(ws, queue: asyncio.Queue) -> None:
+    try:
+        while True:
+            payload = await queue.get()
             await ws.send(payload)
-        except websockets.exceptions.ConnectionClosed:
-            dead.append(ws)
-    for ws in dead:
-        CLIENTS.discard(ws)
+    except websockets.exceptions.ConnectionClosed:
+        # ws_handler's receive loop ends too and unregisters the client.
+        pass
+
+
+def broadcast_payload(payload: str) -> None:
+    """Queue an already-serialized message for every client.
+
+    Never waits on a socket: each client's writer task sends at its own pace,
+    and a client that falls behind loses its oldest queued messages instead of
+    growing memory (see WS_CLIENT_SEND_QUEUE_MAX).
+    """
+    for ws in CLIENTS:
+        queue = CLIENT_QUEUES.get(ws)
+        if queue is not None:
+            _put_drop_oldest(queue, payload)
+
+
+def set_controller_state(**fields) -> None:
+    """Swap in an updated CONTROLLER_STATE, encode it once and broadcast it if it changed."""
+    global CONTROLLER_STATE, CONTROLLER_STATE_JSON
+    state = replace(CONTROLLER_STATE, **fields)
+    if state == CONTROLLER_STATE:
+        # e.g. a flapping port reporting the same disconnect again
+        return
+    CONTROLLER_STATE = state
+    CONTROLLER_STATE_JSON = _json_dumps(state.to_message())
+    broadcast_payload(CONTROLLER_STATE_JSON)
+
+
+# Pending controller "set" messages, keyed by control key (latest wins). Each
+# entry is (the serial line as-is, the JSON text of its value), so flushing
+# builds frames from already-encoded text instead of re-serializing messages.
+PENDING_SETS: dict[str, tuple[str, str]] = {}
+_SET_FLUSH_TASK: Optional[asyncio.Task] = None
+
+
+def _flush_pending_sets() -> None:
+    if not PENDING_SETS:
+        return
+    if len(PENDING_SETS) == 1:
+        ((payload, _value_json),) = PENDING_SETS.values()
+        PENDING_SETS.clear()
+        broadcast_payload(payload)
+        return
+    # The web app applies every entry of a "state" message like an individual "set".
+    values = ",".join(f"{_json_dumps(key)}:{value_json}" for key, (_payload, value_json) in PENDING_SETS.items())
+    PENDING_SETS.clear()
+    broadcast_payload('{"type":"state","values":{' + values + "}}")
+
+
+async def _flush_pending_sets_later() -> None:
+    global _SET_FLUSH_TASK
+    try:
+        await asyncio.sleep(SET_BATCH_WINDOW_SEC)
+    finally:
+        _SET_FLUSH_TASK = None
+    _flush_pending_sets()
+
+
+def _queue_set_payload(key: str, payload: str, value_json: str) -> None:
+    global _SET_FLUSH_TASK
+    PENDING_SETS[key] = (payload, value_json)
+    if _SET_FLUSH_TASK is None:
+        _SET_FLUSH_TASK = asyncio.create_task(_flush_pending_sets_later())
+
+
+def queue_set(msg: dict, line: bytes) -> None:
+    """Queue a controller "set" message for the next batched broadcast.
+
+    `line` is the serial line `msg` was parsed from; it is forwarded unchanged
+    rather than re-encoding `msg`.
+    """
+    payload = line.decode("utf-8")
+    key = msg.get("key")
+    if not isinstance(key, str):
+        broadcast_payload(payload)
+        return
+    _queue_set_payload(key, payload, _json_dumps(msg.get("value")))
+
+
+# The exact shape the controller firmware emits for control updates, e.g.
+#   {"type":"set","key":"volume","value":7}
+# Matching lines are routed from their bytes without a JSON parse, so the value
+# group only accepts text that is valid JSON as-is (JSON number grammar, no
+# control characters in strings): it is pasted verbatim into batched frames.
+# Anything else (other spacing, extra fields, escapes, exponents) falls back to
+# the generic path, which drops lines that don't parse.
+_SET_RE = re.compile(
+    rb'\{"type":"set","key":"(\w+)","value":'
+    rb'(-?(?:0|[1-9]\d*)(?:\.\d+)?|true|false|null|"[^"\\\x00-\x1f]*")\}'
+)
 
 
 async def machine_state_task():
     """Periodically refresh machine IP info and broadcast if it changed."""
-    global MACHINE_STATE
-    last_payload = json.dumps(MACHINE_STATE, sort_keys=True)
+    global MACHINE_STATE, MACHINE_STATE_JSON
     while True:
         try:
             next_state = build_machine_state()
-            next_payload = json.dumps(next_state, sort_keys=True)
-            if next_payload != last_payload:
+            # build_machine_state() emits keys in a fixed order, so equal state encodes equal.
+            next_payload = _json_dumps(next_state)
+            if next_payload != MACHINE_STATE_JSON:
                 MACHINE_STATE = next_state
-                last_payload = next_payload
-                await broadcast(MACHINE_STATE)
+                MACHINE_STATE_JSON = next_payload
+                broadcast_payload(MACHINE_STATE_JSON)
         except Exception:
             pass
         await asyncio.sleep(5.0)
 
 
 async def ws_handler(ws):
-    client = f"{ws.remote_address}"
-    client_id = f"{id(ws):x}"
-    CLIENTS.add(ws)
-    log.info(f"🔗 WS client connected: {client} (id={client_id})")
-
-    # Immediately inform this client about current server + controller status
-    try:
-        await ws.send(json.dumps(SERVER_STATE))
-        await ws.send(json.dumps(MACHINE_STATE))
-    except Exception as e:
-        log.debug(f"⚠️ Could not send initial server status to {client_id}: {e}")
-
-    try:
-        await ws.send(json.dumps(CONTROLLER_STATE))
-    except Exception as e:
-        log.debug(f"⚠️ Could not send initial controller status to {client_id}: {e}")
-
-    # Immediately inform this client about current controller status
-    try:
-        await ws.send(json.dumps(CONTROLLER_STATE))
-    except Exception as e:
-        log.debug(f"⚠️ Could not send initial controller status to {client_id}: {e}")
+    client_id = id(ws)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=WS_CLIENT_SEND_QUEUE_MAX)
+    # Immediately inform this client about current server + machine + controller
+    # status. The initial messages go through the client's queue too, so they
+    # are always delivered before any broadcast queued after registration.
+    queue.put_nowait(SERVER_STATE_JSON)
+    queue.put_nowait(MACHINE_STATE_JSON)
+    queue.put_nowait(CONTROLLER_STATE_JSON)
+    _add_client(ws, queue)
+    writer = asyncio.create_task(_client_writer(ws, queue))
+    log.info("🔗 WS client connected: %s (id=%x)", ws.remote_address, client_id)
 
     try:
         async for raw in ws:
             # Optional: if later you want browser->server commands, handle them here.
-            log.debug(f"📥 WS from {client_id}: {raw}")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("📥 WS from %x: %s", client_id, raw)
     except websockets.exceptions.ConnectionClosed as e:
-        log.info(f"🔌 WS client disconnected: {client_id} code={e.code} reason={e.reason}")
+        log.info("🔌 WS client disconnected: %x code=%s reason=%s", client_id, e.code, e.reason)
     finally:
-        CLIENTS.discard(ws)
+        _remove_client(ws)
+        writer.cancel()
 
 
 # =========================
 # Serial device handling
 # =========================
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ControllerInfo:
     port: str
     device_id: str
@@ -236,73 +440,84 @@ class ControllerInfo:
     fw: str
 
 
-def _write_json_line(ser: serial.Serial, message: dict) -> None:
-    line = (json.dumps(message) + "\n").encode("utf-8")
-    ser.write(line)
-    ser.flush()
+# The probe request never changes, so it is encoded once.
+_PROBE_BYTES = _json_dumps_line({"type": "whoareyou"})
 
 
 # v2
 def _read_json_line(ser: serial.Serial, *, timeout_sec: float) -> Optional[dict]:
-    start = time.time()
-    while (time.time() - start) < timeout_sec:
+    # readline() blocks in the kernel until a full line arrives or ser.timeout
+    # expires, so an idle port costs one wakeup rather than a poll every 100 ms.
+    deadline = time.monotonic() + timeout_sec
+    while True:
         raw = ser.readline()
         if not raw:
-            continue
+            return None
 
-        text = raw.decode("utf-8", errors="replace").strip()
-        if text:
-            log.debug(f"🧪 RX <- {ser.port}: {text}")
+        line = raw.strip()
+        if line and log.isEnabledFor(logging.DEBUG):
+            log.debug("🧪 RX <- %s: %s", ser.port, line.decode("utf-8", errors="replace"))
 
-        # ✅ Skip non-JSON debug lines like: "DBG volume=42"
-        if not text.startswith("{"):
-            continue
+        # ✅ Skip non-JSON debug lines like: "DBG volume=42" (checked on bytes, no decode)
+        if line[:1] == b"{":
+            try:
+                return _json_loads(line)
+            except ValueError:
+                # Malformed JSON or invalid UTF-8 (orjson.JSONDecodeError is a ValueError too)
+                pass
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        # Keep the next readline() from blocking past the deadline.
+        ser.timeout = max(0.05, remaining)
 
-        if not text:
-            continue
-        try:
-            return json.loads(text)
-        except Exception:
-            continue
-    return None
 
+# A successful probe: the controller and its port, still open.
+ProbeHit = Tuple[ControllerInfo, serial.Serial]
 
-def _probe_port_for_controller(port: str) -> Optional[ControllerInfo]:
+
+def _probe_port_for_controller(port: str) -> Optional[ProbeHit]:
     """
     Open a port briefly, ask whoareyou, wait for hello.
+
+    On a match the port is returned still open, so the connection reuses it
+    instead of closing and reopening (which drops whatever arrived in between).
     """
+    hit: Optional[ProbeHit] = None
     try:
-        ser = serial.Serial(port=port, baudrate=SERIAL_BAUD, timeout=0.1)
+        ser = serial.Serial(port=port, baudrate=SERIAL_BAUD, timeout=SERIAL_PROBE_TIMEOUT_SEC)
     except Exception as e:
-        log.debug(f"🧪 Probe open failed: {port} ({e})")
+        log.debug("🧪 Probe open failed: %s (%s)", port, e)
         return None
 
     try:
-        log.debug(f"🧪 Probing serial port: {port}")
+        log.debug("🧪 Probing serial port: %s", port)
 
         # Ask device to identify itself
-        probe_msg = {"type": "whoareyou"}
-
         # DEBUG: show what we send
-        log.debug(f"🧪 TX -> {port}: {probe_msg}")
+        log.debug("🧪 TX -> %s: %r", port, _PROBE_BYTES)
 
-        _write_json_line(ser, probe_msg)
+        # No flush(): on POSIX that is tcdrain(), which blocks until the UART has
+        # shifted the bytes out. write() already hands them to the kernel.
+        ser.write(_PROBE_BYTES)
 
         # DEBUG: show what we expect
-        expected = {
-            "type": "hello",
-            "deviceType": TARGET_DEVICE_TYPE,
-            "deviceId": TARGET_DEVICE_ID if TARGET_DEVICE_ID is not None else "<any>",
-        }
-        log.debug(f"🧪 EXPECT <- {port}: {expected}")
+        if log.isEnabledFor(logging.DEBUG):
+            expected = {
+                "type": "hello",
+                "deviceType": TARGET_DEVICE_TYPE,
+                "deviceId": TARGET_DEVICE_ID if TARGET_DEVICE_ID is not None else "<any>",
+            }
+            log.debug("🧪 EXPECT <- %s: %s", port, expected)
 
         msg = _read_json_line(ser, timeout_sec=SERIAL_PROBE_TIMEOUT_SEC)
         if not msg:
-            log.debug(f"🧪 No response on: {port}")
+            log.debug("🧪 No response on: %s", port)
             return None
 
         if msg.get("type") != "hello":
-            log.debug(f"🧪 Unexpected response on {port}: {msg}")
+            log.debug("🧪 Unexpected response on %s: %s", port, msg)
             return None
 
         device_type = str(msg.get("deviceType", ""))
@@ -310,129 +525,346 @@ def _probe_port_for_controller(port: str) -> Optional[ControllerInfo]:
         fw = str(msg.get("fw", ""))
 
         if device_type != TARGET_DEVICE_TYPE:
-            log.debug(f"🧪 Not our deviceType on {port}: {device_type}")
+            log.debug("🧪 Not our deviceType on %s: %s", port, device_type)
             return None
 
         if TARGET_DEVICE_ID is not None and device_id != TARGET_DEVICE_ID:
-            log.debug(f"🧪 Not our deviceId on {port}: {device_id}")
+            log.debug("🧪 Not our deviceId on %s: %s", port, device_id)
             return None
 
-        log.info(f"✅ Found controller on {port}: deviceId={device_id} fw={fw}")
-        return ControllerInfo(port=port, device_id=device_id, device_type=device_type, fw=fw)
+        log.info("✅ Found controller on %s: deviceId=%s fw=%s", port, device_id, fw)
+        info = ControllerInfo(port=port, device_id=device_id, device_type=device_type, fw=fw)
+        hit = (info, ser)
+        return hit
 
     except Exception as e:
-        log.debug(f"🧪 Probe error on {port}: {e}")
+        log.debug("🧪 Probe error on %s: %s", port, e)
         return None
     finally:
+        if hit is None:
+            try:
+                ser.close()
+            except Exception:
+                pass
+
+
+def _serial_reader_thread(
+    ser: serial.Serial,
+    loop: asyncio.AbstractEventLoop,
+    queue: asyncio.Queue,
+    stop: threading.Event,
+) -> None:
+    """Blocking serial read loop for one controller connection (own thread).
+
+    Waits for one byte (bounded by ser.timeout), then drains everything the
+    driver already has with a single read(in_waiting) and splits complete lines
+    with bytearray.find(), instead of readline()'s byte-at-a-time reads. Each
+    wakeup hands one list of lines to the event loop; a read error is queued as
+    the exception object itself so serial_reader_task can handle the disconnect.
+    """
+    buf = bytearray()
+    try:
+        while not stop.is_set():
+            chunk = ser.read(1)
+            if not chunk:
+                continue
+            buf += chunk
+            waiting = ser.in_waiting
+            if waiting:
+                buf += ser.read(waiting)
+
+            lines: list[bytes] = []
+            start = 0
+            while True:
+                nl = buf.find(b"\n", start)
+                if nl < 0:
+                    break
+                lines.append(bytes(buf[start:nl]))
+                start = nl + 1
+            if not start:
+                # Partial line only; keep reading until it completes.
+                continue
+            del buf[:start]
+            loop.call_soon_threadsafe(_put_drop_oldest, queue, lines)
+    except Exception as e:
+        if stop.is_set():
+            return
         try:
-            ser.close()
-        except Exception:
+            loop.call_soon_threadsafe(_put_drop_oldest, queue, e)
+        except RuntimeError:
+            # Event loop already closed (shutdown).
             pass
 
 
+def _is_candidate_port(p) -> bool:
+    if not SERIAL_FILTER_USB_IDS:
+        return True
+    if p.vid is not None and ((p.vid, p.pid) in SERIAL_USB_IDS or (p.vid, None) in SERIAL_USB_IDS):
+        return True
+    if p.vid is None:
+        log.info("🚫 Skipping serial port %s (no USB VID:PID)", p.device)
+    else:
+        log.info("🚫 Skipping serial port %s (VID:PID %04X:%04X not in SERIAL_USB_IDS)",
+                 p.device, p.vid, p.pid or 0)
+    return False
+
+
+# (fingerprint, ports) of the last comports() walk; see _list_candidate_ports().
+_PORTS_CACHE: Optional[Tuple[tuple, list[str]]] = None
+
+
+def _dev_fingerprint() -> Optional[tuple]:
+    # Serial devices appear/disappear as /dev nodes, so an unchanged /dev listing
+    # means an unchanged port list. None = no cheap fingerprint on this platform.
+    if os.name != "posix":
+        return None
+    try:
+        return tuple(sorted(os.listdir("/dev")))
+    except OSError:
+        return None
+
+
 def _list_candidate_ports() -> list[str]:
-    ports = []
-    for p in serial.tools.list_ports.comports():
-        ports.append(p.device)
+    """Candidate controller ports; skips the comports() sysfs walk while /dev is unchanged."""
+    global _PORTS_CACHE
+    fp = _dev_fingerprint()
+    if fp is not None and _PORTS_CACHE is not None and _PORTS_CACHE[0] == fp:
+        return _PORTS_CACHE[1]
+    ports = [p.device for p in serial.tools.list_ports.comports() if _is_candidate_port(p)]
+    _PORTS_CACHE = (fp, ports) if fp is not None else None
     return ports
 
 
+def _close_unclaimed_probe(probe: asyncio.Future, keep: Optional[ProbeHit]) -> None:
+    # Any probe hit other than the one serial_reader_task took over (e.g. a
+    # second port answering after we already picked one).
+    if probe.cancelled() or probe.exception() is not None:
+        return
+    hit = probe.result()
+    if hit and hit is not keep:
+        try:
+            hit[1].close()
+        except Exception:
+            pass
+
+
+async def _probe_ports(ports: list[str]) -> Optional[ProbeHit]:
+    """Probe ports concurrently and return the first controller that answers.
+
+    A scan takes about one probe timeout instead of one per port. Probes still
+    running when a controller answers finish on their own timeout in the
+    background; any port they opened is closed again, and probes that have not
+    started yet are skipped.
+    """
+    slots = asyncio.Semaphore(SERIAL_PROBE_CONCURRENCY)
+    winner: Optional[ProbeHit] = None
+
+    async def _probe(port: str) -> Optional[ProbeHit]:
+        async with slots:
+            if winner is not None:
+                return None
+            return await asyncio.to_thread(_probe_port_for_controller, port)
+
+    tasks = [asyncio.create_task(_probe(port)) for port in ports]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            hit = await next_done
+            if hit:
+                winner = hit
+                return hit
+        return None
+    finally:
+        # The worker threads can't be interrupted, so let them finish and only
+        # close what they hand back (a cancelled to_thread would drop it).
+        for task in tasks:
+            task.add_done_callback(lambda t: _close_unclaimed_probe(t, winner))
+
+
+SERIAL_HOTPLUG = asyncio.Event()
+
+
+def _start_hotplug_monitor(loop: asyncio.AbstractEventLoop) -> bool:
+    """Set SERIAL_HOTPLUG on every udev tty event. Returns False if unavailable."""
+    if pyudev is None:
+        return False
+    try:
+        monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+        monitor.filter_by("tty")
+        observer = pyudev.MonitorObserver(
+            monitor,
+            callback=lambda _device: loop.call_soon_threadsafe(SERIAL_HOTPLUG.set),
+            name="serial-hotplug",
+        )
+        observer.daemon = True
+        observer.start()
+    except Exception as e:
+        log.debug("🔌 udev hotplug monitor unavailable: %s", e)
+        return False
+    return True
+
+
+async def _wait_for_rescan(delay: float) -> None:
+    try:
+        await asyncio.wait_for(SERIAL_HOTPLUG.wait(), timeout=delay)
+    except asyncio.TimeoutError:
+        pass
+    SERIAL_HOTPLUG.clear()
+
+
+def _ignore_serial_message(msg: dict, line: bytes) -> None:
+    pass
+
+
+# Controller message type -> handler. Only "set" messages are forwarded (batched,
+# latest value per key); "hello" can happen if the ESP prints it on its own.
+# Unknown types are ignored for now.
+SERIAL_HANDLERS = {
+    "set": queue_set,
+    "hello": _ignore_serial_message,
+}
+
+
 async def serial_reader_task():
     """
     Keeps trying to find the controller. When found, stays connected and forwards incoming messages to WS.
     If disconnected, goes back to scanning.
     """
+    if _start_hotplug_monitor(asyncio.get_running_loop()):
+        log.info("🔌 Serial hotplug: udev monitor active")
+
+    backoff = SERIAL_SCAN_MIN_INTERVAL_SEC
     while True:
         ports = _list_candidate_ports()
-        log.debug(f"🔎 Serial scan: {ports}")
+        log.debug("🔎 Serial scan: %s", ports)
 
-        controller = None
-        for port in ports:
-            controller = await asyncio.to_thread(_probe_port_for_controller, port)
-            if controller:
-                break
-
-        if not controller:
-            await asyncio.sleep(SERIAL_SCAN_INTERVAL_SEC)
-            continue
-
-        # We found it — now open “for real” and stream messages
-        try:
-            ser = serial.Serial(port=controller.port, baudrate=SERIAL_BAUD, timeout=0.2)
-        except Exception as e:
-            log.warning(f"⚠️ Could not open controller port {controller.port}: {e}")
-            await asyncio.sleep(SERIAL_SCAN_INTERVAL_SEC)
+        hit = await _probe_ports(ports)
+        if not hit:
+            await _wait_for_rescan(backoff)
+            backoff = min(backoff * 2, SERIAL_SCAN_MAX_INTERVAL_SEC)
             continue
-
-        log.info(f"🎛️ Controller connected on {controller.port} (deviceId={controller.device_id})")
+        backoff = SERIAL_SCAN_MIN_INTERVAL_SEC
+
+        # We found it — keep the probe's handle open and stream messages;
+        # switch to the reader thread's poll timeout.
+        controller, ser = hit
+        ser.timeout = 0.2
+
+        log.info("🎛️ Controller connected on %s (deviceId=%s)", controller.port, controller.device_id)
+
+        # One long-lived reader thread per connection instead of a thread-pool
+        # dispatch (asyncio.to_thread) for every single line.
+        rx_queue: asyncio.Queue = asyncio.Queue(maxsize=SERIAL_RX_QUEUE_MAX)
+        rx_stop = threading.Event()
+        rx_thread = threading.Thread(
+            target=_serial_reader_thread,
+            args=(ser, asyncio.get_running_loop(), rx_queue, rx_stop),
+            name=f"serial-rx {controller.port}",
+            daemon=True,
+        )
+        rx_thread.start()
+        # Only filled when SERIAL_DEBUG is on; logged if the controller drops.
+        recent_lines: deque = deque(maxlen=SERIAL_DEBUG_RING_SIZE)
 
         try:            # Tell WS clients we have a controller (optional UI feature)
-            CONTROLLER_STATE.update({
-                "type": "controller",
-                "status": "connected",
-                "port": controller.port,
-                "deviceId": controller.device_id,
-                "fw": controller.fw,
-            })
-            await broadcast(CONTROLLER_STATE)
-
+            set_controller_state(
+                status="connected",
+                port=controller.port,
+                device_id=controller.device_id,
+                fw=controller.fw,
+            )
+
+            handlers = SERIAL_HANDLERS
+            set_match = _SET_RE.fullmatch
             while True:
-                # ✅ IMPORTANT: don't block the asyncio loop with a sync readline()
-                raw = await asyncio.to_thread(ser.readline)
-
-                if not raw:
-                    continue
-
-                text = raw.decode("utf-8", errors="replace").strip()
-                if not text:
-                    continue
-
-                # Debug: show raw serial line
-                log.debug(f"📟 SERIAL {controller.port}: {text}")
-
-                try:
-                    msg = json.loads(text)
-                except Exception:
-                    continue
-
-                # Only forward "set" messages (or forward all if you prefer)
-                if msg.get("type") == "set":
-                    # Forward as-is to the web app
-                    await broadcast(msg)
-                elif msg.get("type") == "hello":
-                    # Could happen if ESP prints hello on its own; ignore or log
-                    pass
-                else:
-                    # For now: ignore other types
-                    pass
+                # ✅ IMPORTANT: serial reads run in the reader thread, never on the asyncio loop
+                batch = await rx_queue.get()
+                if isinstance(batch, Exception):
+                    raise batch
+
+                for raw in batch:
+                    line = raw.strip()
+                    if not line:
+                        continue
+
+                    if SERIAL_DEBUG:
+                        recent_lines.append(line)
+
+                    m = set_match(line)
+                    if m is not None:
+                        _queue_set_payload(
+                            m.group(1).decode("ascii"),
+                            line.decode("utf-8", errors="replace"),
+                            m.group(2).decode("utf-8", errors="replace"),
+                        )
+                        continue
+
+                    # Skip non-JSON debug lines before paying for a failed parse + exception.
+                    if line[:1] != b"{":
+                        continue
+                    try:
+                        msg = _json_loads(line)
+                    except ValueError:
+                        continue
+                    # A malformed frame (e.g. "type": [..]) must not reach the dict
+                    # lookup: an unhashable key would raise and drop the connection.
+                    if not isinstance(msg, dict) or not isinstance(msg.get("type"), str):
+                        continue
+
+                    handlers.get(msg.get("type"), _ignore_serial_message)(msg, line)
 
         except Exception as e:
-            log.warning(f"🔌 Controller disconnected / read error on {controller.port}: {e}")
+            log.warning("🔌 Controller disconnected / read error on %s: %s", controller.port, e)
+            if recent_lines:
+                log.debug(
+                    "📟 SERIAL %s: last %d lines before disconnect:\n%s",
+                    controller.port,
+                    len(recent_lines),
+                    "\n".join(line.decode("utf-8", errors="replace") for line in recent_lines),
+                )
         finally:
+            # Wake the reader thread out of its blocking read and let it exit
+            # before closing: closing the port under an in-flight read is racy.
+            rx_stop.set()
+            try:
+                ser.cancel_read()
+            except Exception:
+                pass
+            await asyncio.to_thread(rx_thread.join, 1.0)
             try:
                 ser.close()
             except Exception:
                 pass
 
-            CONTROLLER_STATE.update({
-                "type": "controller",
-                "status": "disconnected",
-                "port": controller.port,
-                "deviceId": controller.device_id,
-            })
-            await broadcast(CONTROLLER_STATE)
+            set_controller_state(
+                status="disconnected",
+                port=controller.port,
+                device_id=controller.device_id,
+            )
 
             # Back to scanning
-            await asyncio.sleep(SERIAL_SCAN_INTERVAL_SEC)
+            await _wait_for_rescan(backoff)
 
 
 async def main():
     log.info(f"🚀 Signalsmith Control Server v{SERVER_STATE.get('version', '0.0.0')} starting up...")
     log.info(f"🌐 WS on ws://{WS_HOST}:{WS_PORT}")
-    log.info(f"🔧 Serial: baud={SERIAL_BAUD} scanEvery={SERIAL_SCAN_INTERVAL_SEC}s probeTimeout={SERIAL_PROBE_TIMEOUT_SEC}s")
+    log.info(f"🔧 Serial: baud={SERIAL_BAUD} scanEvery={SERIAL_SCAN_MIN_INTERVAL_SEC}-{SERIAL_SCAN_MAX_INTERVAL_SEC}s probeTimeout={SERIAL_PROBE_TIMEOUT_SEC}s")
     log.info(f"🎯 Match: deviceType={TARGET_DEVICE_TYPE} deviceId={TARGET_DEVICE_ID}")
-
-    async with websockets.serve(ws_handler, WS_HOST, WS_PORT):
+    log.info(f"🔌 USB VID/PID filter: {'on' if SERIAL_FILTER_USB_IDS else 'off'}")
+    log.info(f"🧾 JSON backend: {JSON_BACKEND}")
+
+    # Frames are tiny JSON messages: permessage-deflate costs more CPU than it
+    # saves. Clients don't send anything meaningful yet, so keep what a single
+    # connection may buffer on the receive side small as well; the send side is
+    # bounded by WS_CLIENT_SEND_QUEUE_MAX per client.
+    async with websockets.serve(
+        ws_handler,
+        WS_HOST,
+        WS_PORT,
+        compression=None,
+        max_size=2**16,
+        max_queue=16,
+    ):
         log.info("✅ WebSocket server started")
 
         # Start background tasks
@@ -443,8 +875,19 @@ async def main():
         await asyncio.gather(serial_task, machine_task)
 
 
+def _run(coro) -> None:
+    # uvloop.run() exists since uvloop 0.18; older releases only have install().
+    if uvloop is None:
+        asyncio.run(coro)
+    elif hasattr(uvloop, "run"):
+        uvloop.run(coro)
+    else:
+        uvloop.install()
+        asyncio.run(coro)
+
+
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        _run(main())
     except KeyboardInterrupt:
         pass
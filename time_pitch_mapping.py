@@ -63,6 +63,9 @@ def iter_encoder_map_entries(topology: TimePitchTopology = TIME_PITCH_TOPOLOGY)
 def build_encoder_map_entries_sorted(topology: TimePitchTopology = TIME_PITCH_TOPOLOGY) -> List[Tuple[EncoderId, ControllerId, Channel]]:
     """Deterministic ordering: encoder name, then controller, then channel."""
 
+    if topology is TIME_PITCH_TOPOLOGY:
+        # Computed once at import (see ENCODER_MAP_SORTED below).
+        return list(ENCODER_MAP_SORTED)
     entries = list(iter_encoder_map_entries(topology))
     entries.sort(key=lambda t: (t[0], t[1], t[2]))
     return entries
@@ -84,3 +87,14 @@ def validate_topology(topology: TimePitchTopology = TIME_PITCH_TOPOLOGY) -> None
 
 # Validate at import time so both server and tooling fail fast.
 validate_topology(TIME_PITCH_TOPOLOGY)
+
+# Flattened/sorted SSOT, computed once. TIME_PITCH_TOPOLOGY is treated as
+# read-only after import.
+ENCODER_MAP_SORTED: Tuple[Tuple[EncoderId, ControllerId, Channel], ...] = tuple(
+    sorted(iter_encoder_map_entries(TIME_PITCH_TOPOLOGY))
+)
+
+# Reverse index: encoder fixture -> (controller, channel).
+BY_ENCODER: Dict[EncoderId, Tuple[ControllerId, Channel]] = {
+    enc: (ctl, ch) for enc, ctl, ch in ENCODER_MAP_SORTED
+}